@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from tobyscript.lib import audio
+from tobyscript.lib.script import parse
+
+
+def render_by_hand(events, speed: float = 1.0, wait: float = 0.5) -> np.ndarray:
+    """Add each sound in one at a time, at the same offsets `render` uses."""
+    rate = audio.sound("beep")[1]
+    copies = []
+    t = 0.0
+    for delay, _, event, s in audio.steps(events, audio.DELAY_PER_CHARACTER):
+        t += delay / speed
+        if s is not None:
+            copies.append((int(np.rint(t * rate)), audio.sound(s)[0]))
+        if isinstance(event, audio.WaitEvent):
+            t += wait / speed
+    end = max([int(np.ceil(t * rate))] + [offset + len(samples) for offset, samples in copies])
+    out = np.zeros((end, 2), dtype = np.float32)
+    for offset, samples in copies:
+        out[offset:offset + len(samples)] += samples
+    return out
+
+
+@pytest.mark.parametrize("s", ["* Howdy^2!/", R"* \SpHello?/% \E2* Hi./", "* " + "a" * 300 + "/"])
+def test_render_matches_adding_one_at_a_time(s):
+    events = parse(s)
+    out, rate = audio.render(events)
+    assert rate == 44100
+    assert np.array_equal(out, render_by_hand(events))
+
+
+def test_render_rejects_mismatched_sounds(monkeypatch):
+    beep = audio.sound("beep")
+    mono = (beep[0][:, :1], beep[1])
+    monkeypatch.setattr(audio, "sound", lambda name: mono if name == "phone" else beep)
+    with pytest.raises(ValueError, match = "channel"):
+        audio.render(parse("* Hi/"))
+
+
+def test_render_corpus_keeps_same_names_apart(tmp_path):
+    for folder in ("one", "two"):
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / "intro.txt").write_text("* Hi/\n", encoding = "utf-8")
+    out = tmp_path / "out"
+    written = audio.render_corpus([tmp_path / "one" / "intro.txt", tmp_path / "two" / "intro.txt"], out, processes = 1)
+    assert sorted(written) == [str(out / "one" / "intro-0001.wav"), str(out / "two" / "intro-0001.wav")]
+
+
+def test_render_corpus_rejects_same_stem(tmp_path):
+    (tmp_path / "intro.txt").write_text("* Hi/\n", encoding = "utf-8")
+    (tmp_path / "intro.tobyscript").write_text("* Hi/\n", encoding = "utf-8")
+    with pytest.raises(ValueError):
+        audio.render_corpus([tmp_path / "intro.txt", tmp_path / "intro.tobyscript"], tmp_path / "out", processes = 1)
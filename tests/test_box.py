@@ -0,0 +1,112 @@
+import pytest
+
+from tobyscript.lib.script import CloseEvent, parse
+
+box = pytest.importorskip("tobyscript.objects.box")
+arcade = pytest.importorskip("arcade")
+
+DELAY = 0.1
+
+
+class FakeDocument:
+    def __init__(self):
+        self.text = ""
+        self.colors: list = []
+
+    def insert_text(self, start: int, text: str, attributes: dict):
+        self.text = self.text[:start] + text + self.text[start:]
+        self.colors[start:start] = [attributes["color"]] * len(text)
+
+    def delete_text(self, start: int, end: int):
+        self.text = self.text[:start] + self.text[end:]
+        del self.colors[start:end]
+
+
+class FakeLabel:
+    def __init__(self):
+        self.updating = 0
+        self.updates = 0
+
+    def begin_update(self):
+        self.updating += 1
+
+    def end_update(self):
+        self.updating -= 1
+        self.updates += 1
+
+
+def make_box(events: str | list) -> "box.DialogueBox":
+    """A `DialogueBox` typing `events` (or a string to parse), without a window."""
+    b = box.DialogueBox.__new__(box.DialogueBox)
+    b.events = parse(events) if isinstance(events, str) else events
+    b.delay_per_character = DELAY
+    b.wait = DELAY * 2
+    b._font_size = 30
+    b.document = FakeDocument()
+    b.label = FakeLabel()
+    b.restart()
+    return b
+
+
+def test_types_one_character_per_delay():
+    b = make_box("* Hi/")
+    b.update(DELAY * 0.5)
+    assert b.document.text == ""
+    b.update(DELAY * 0.6)
+    assert b.document.text == "*"
+    b.update(DELAY)
+    assert b.document.text == "* "
+
+
+def test_catches_up_in_one_layout():
+    b = make_box("* Hello there/")
+    b.update(DELAY * 5.5)
+    assert b.document.text == "* Hel"
+    assert b.label.updates == 1
+    assert b.label.updating == 0
+
+
+def test_pause_delays_the_next_character():
+    # ^1 waits 10 characters' worth before the character after it.
+    b = make_box("* a^1 b/")
+    b.update(DELAY * 4.5)
+    assert b.document.text == "* a "
+    b.update(DELAY * 10)
+    assert b.document.text == "* a "
+    b.update(DELAY)
+    assert b.document.text == "* a b"
+
+
+def test_color_applies_to_later_characters():
+    b = make_box(R"* \Ya/")
+    b.update(DELAY * 3.5)
+    assert b.document.text == "* a"
+    assert b.document.colors[0] == arcade.color.WHITE
+    assert b.document.colors[2] == b.font_color != arcade.color.WHITE
+
+
+@pytest.mark.parametrize("events", [parse("* a/%* b/"), parse("* a/") + [CloseEvent()] + parse(" b/")])
+def test_skip_and_close_clear_the_text(events):
+    b = make_box(events)
+    # "* a", then the WaitEvent holds it for two characters' worth.
+    b.update(DELAY * 4.5)
+    assert b.document.text == "* a"
+    b.update(DELAY)
+    assert b.document.text == ""
+    b.update(DELAY * 2)
+    assert b.document.text == " b"
+
+
+def test_holds_the_text_then_restarts():
+    b = make_box(R"* \Yab/")
+    b.update(DELAY * 4.5)
+    assert b.document.text == "* ab"
+    b.update(DELAY)
+    assert b.document.text == "* ab"
+    # Once the hold is over, the box starts over: cleared, in white, and typing from the top.
+    b.update(DELAY)
+    assert b.document.text == ""
+    assert b.font_color == arcade.color.WHITE
+    b.update(DELAY)
+    assert b.document.text == "*"
+    assert b.document.colors == [arcade.color.WHITE]
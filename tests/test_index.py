@@ -0,0 +1,67 @@
+from tobyscript.lib.index import SearchIndex, tokenize_events
+from tobyscript.lib.script import parse
+
+
+def test_offsets_survive_normalization():
+    # "ß" casefolds to "ss", which makes the text longer.
+    tokens = tokenize_events(parse(R"* ßßßß xy\Y ab/"))
+    assert [(t, o) for t, o, _ in tokens] == [("ssssssss", 0), ("xy", 0), ("ab", 2)]
+
+
+def test_word_split_by_code():
+    tokens = tokenize_events(parse(R"* \YFLO\WWEY/"))
+    assert [(t, o) for t, o, _ in tokens] == [("flowey", 2)]
+
+
+def test_phrase_search():
+    index = SearchIndex()
+    index.index_text("a", "* hey there/\n* hey, you there/\n* oh hey there/")
+    assert index.search("hey there") == [("a", 1, 0), ("a", 3, 0)]
+    assert index.search("HEY") == [("a", 1, 0), ("a", 2, 0), ("a", 3, 0)]
+    assert index.search("nope") == []
+
+
+def test_facets_are_per_posting():
+    index = SearchIndex()
+    index.index_text("a", R"* foo \Yfoo\W foo/" + "\n" + R"\Ts* foo \TP* foo/")
+    assert index.search("foo", color = "yellow") == [("a", 1, 2)]
+    assert index.search("foo", color = "white") == [("a", 1, 0), ("a", 1, 4), ("a", 2, 1), ("a", 2, 3)]
+    assert index.search("foo", speaker = "Sans") == [("a", 2, 1)]
+    assert index.search("foo", speaker = "Papryus") == [("a", 2, 3)]
+    assert index.search("foo", speaker = "Sans", color = "yellow") == []
+
+
+def test_default_speaker_face_and_emotion():
+    index = SearchIndex()
+    index.index_text("a", "* foo/\n" + R"\F3\E2* foo/")
+    assert index.search("foo", speaker = "Default") == [("a", 1, 0), ("a", 2, 2)]
+    assert index.search("foo", emotion = 0) == [("a", 1, 0)]
+    assert index.search("foo", face = "Sans", emotion = 2) == [("a", 2, 2)]
+
+
+def test_refresh_reuses_split_on(tmp_path):
+    path = tmp_path / "script.txt"
+    path.write_text("* one/|* two/|* three/", encoding = "utf-8")
+    index = SearchIndex()
+    assert index.add_file(path, split_on = "|")
+    assert index.search("three") == [(str(path), 3, 0)]
+
+    path.write_text("* zero/|* one/|* two/|* three/", encoding = "utf-8")
+    index.files[str(path)]["mtime"] = 0
+    assert index.refresh() == [str(path)]
+    assert index.search("three") == [(str(path), 4, 0)]
+    assert not index.add_file(path)
+
+    path.unlink()
+    assert index.refresh() == [str(path)]
+    assert index.search("three") == []
+
+
+def test_save_and_load(tmp_path):
+    index = SearchIndex()
+    index.index_text("a", R"* foo \Ybar/" + "\n* bar/")
+    index.save(tmp_path / "index")
+    loaded = SearchIndex.load(tmp_path / "index")
+    assert loaded.search("foo bar") == [("a", 1, 0)]
+    assert loaded.search("bar", color = "yellow") == [("a", 1, 2)]
+    assert loaded.files["a"]["split_on"] is None
@@ -0,0 +1,55 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("tobyscript.views.multibox")
+
+# Needs a GL context, and headless mode has to be picked before arcade is imported, so run it in its own process.
+SCRIPT = """
+import json
+import arcade
+import pyglet
+from tobyscript.views.multibox import DrawCallCounter
+
+try:
+    window = arcade.Window(200, 100)
+except Exception as e:
+    print(json.dumps({"skip": repr(e)}))
+    raise SystemExit
+
+counter = DrawCallCounter()
+counts = {}
+counter.install()
+
+sprite_list = arcade.SpriteList()
+for i in range(5):
+    sprite_list.append(arcade.SpriteSolidColor(10, 10, (255, 0, 0, 255)))
+sprite_list.draw()
+counts["sprite_list"] = counter.count
+
+counter.count = 0
+batch = pyglet.graphics.Batch()
+labels = [pyglet.text.Label(text, y = 20 * i, batch = batch) for i, text in enumerate(["hello", "there"])]
+batch.draw()
+counts["batch"] = counter.count
+
+counter.uninstall()
+counter.count = 0
+batch.draw()
+counts["uninstalled"] = counter.count
+print(json.dumps(counts))
+"""
+
+
+def test_counter_sees_sprite_list_and_batch_draws():
+    result = subprocess.run([sys.executable, "-c", SCRIPT], capture_output = True, text = True, timeout = 120,
+                            env = {**os.environ, "ARCADE_HEADLESS": "1"})
+    assert result.returncode == 0, result.stderr
+    counts = json.loads(result.stdout.strip().splitlines()[-1])
+    if "skip" in counts:
+        pytest.skip(f"no GL context: {counts['skip']}")
+    # One instanced draw for the whole sprite list, and the two labels share one vertex domain.
+    assert counts == {"sprite_list": 1, "batch": 1, "uninstalled": 0}
@@ -0,0 +1,63 @@
+import pytest
+
+from tobyscript.lib.script import parse
+
+screen = pytest.importorskip("tobyscript.views.screen")
+
+
+class FakeWindow:
+    def __init__(self):
+        self.update_rate = self.draw_rate = 1 / 60
+
+    def set_update_rate(self, rate: float):
+        self.update_rate = rate
+
+    def set_draw_rate(self, rate: float):
+        self.draw_rate = rate
+
+
+def make_view(text_events: list, current_string: str = "", paused: bool = False):
+    """An adaptive `ScreenView` without a real window."""
+    view = screen.ScreenView.__new__(screen.ScreenView)
+    view.window = FakeWindow()
+    view.update_rate = 1 / 240
+    view.draw_rate = 1 / 60
+    view.idle_rate = 1 / 4
+    view._scheduled_rates = (1 / 60, 1 / 60)
+    view.text_events = text_events
+    view._current_string = current_string
+    view._current_pause = 0.0
+    view._current_wait = 0.0
+    view.paused = paused
+    return view
+
+
+def test_typing_runs_at_full_rate():
+    view = make_view(parse("* hello/"))
+    view.reschedule()
+    assert (view.window.update_rate, view.window.draw_rate) == (1 / 240, 1 / 60)
+
+
+def test_paused_is_idle():
+    view = make_view(parse("* hello/"), paused = True)
+    view.reschedule()
+    assert (view.window.update_rate, view.window.draw_rate) == (1 / 4, 1 / 4)
+
+
+def test_out_of_text_is_idle():
+    view = make_view([])
+    view.reschedule()
+    assert (view.window.update_rate, view.window.draw_rate) == (1 / 4, 1 / 4)
+
+    # Still typing the last of the line.
+    view = make_view([], current_string = "lo")
+    view.reschedule()
+    assert view.window.update_rate == 1 / 240
+
+
+def test_pause_wakes_up_when_it_ends():
+    view = make_view(parse("* hello/"))
+    view._current_pause = 0.5
+    view._current_wait = 0.2
+    view.reschedule()
+    assert view.window.update_rate == view.window.draw_rate == pytest.approx(0.3)
@@ -0,0 +1,81 @@
+import copy
+import pickle
+
+import pytest
+
+from tobyscript.lib.script import (ColorEvent, Interner, PauseEvent, TextEvent, WaitEvent, parse, parse_lines,
+                                   to_tobyscript)
+
+
+def dump(events) -> list[tuple[str, object]]:
+    return [(type(e).__name__, e.data) for e in events]
+
+
+@pytest.mark.parametrize("event", [TextEvent("* hi"), PauseEvent(2), ColorEvent("Y"), WaitEvent()])
+def test_events_are_immutable(event):
+    with pytest.raises(AttributeError):
+        event.data = "changed"
+    with pytest.raises(AttributeError):
+        del event.data
+    with pytest.raises(AttributeError):
+        event.other = 1
+
+
+@pytest.mark.parametrize("event", [TextEvent("* hi"), PauseEvent(2), ColorEvent("Y"), WaitEvent()])
+def test_copy_and_pickle(event):
+    for other in (copy.copy(event), copy.deepcopy(event), pickle.loads(pickle.dumps(event))):
+        assert type(other) is type(event)
+        assert other.data == event.data
+        with pytest.raises(AttributeError):
+            other.data = "changed"
+    # Subclasses that add their own attributes (like ColorEvent.rgba) still work after a round trip.
+    if isinstance(event, ColorEvent):
+        assert pickle.loads(pickle.dumps(event)).rgba == event.rgba
+
+
+def test_interner_shares_events_across_lines():
+    interner = Interner()
+    a, b = parse_lines("* hi\\Y there/\n* hi\\Y you/", interner = interner)
+    assert a[0] is b[0]  # "* hi"
+    assert a[1] is b[1]  # \Y
+    assert a[-1] is b[-1]  # /
+    assert a[2] is not b[2]
+    # Events equal to one it's seen come back as that one, and so does their text.
+    assert interner.event(TextEvent("* hi")) is a[0]
+    assert interner.string("".join(["* ", "hi"])) is a[0].data
+    # Different types with the same data aren't mixed up.
+    assert interner.event(TextEvent("Y")) is not a[1]
+
+
+def test_interning_does_not_change_the_output():
+    s = "* hi\\Y there/\n* hi\\Y you/"
+    assert [dump(events) for events in parse_lines(s, interner = Interner())] == [dump(events) for events in parse_lines(s)]
+
+
+# What parse gave before events were immutable, when the pause postfix still edited the TextEvent in place.
+POSTFIX_CASES = [
+    (R"\W* Howdy^2!&* I'm\Y FLOWEY\W.^2 &* \YFLOWEY\W the \YFLOWER\W!/",
+     [("ColorEvent", "W"), ("TextEvent", "* Howdy!"), ("PauseEvent", 2), ("TextEvent", "\n* I'm"), ("ColorEvent", "Y"),
+      ("TextEvent", " FLOWEY"), ("ColorEvent", "W"), ("TextEvent", ". "), ("PauseEvent", 2), ("TextEvent", "\n* "),
+      ("ColorEvent", "Y"), ("TextEvent", "FLOWEY"), ("ColorEvent", "W"), ("TextEvent", " the "), ("ColorEvent", "Y"),
+      ("TextEvent", "FLOWER"), ("ColorEvent", "W"), ("TextEvent", "!"), ("WaitEvent", None)]),
+    ("* a^1b^2c/", [("TextEvent", "* ab"), ("PauseEvent", 1), ("PauseEvent", 2), ("TextEvent", "c"), ("WaitEvent", None)]),
+    ("* a^1", [("TextEvent", "* a"), ("PauseEvent", 1)]),
+]
+
+
+@pytest.mark.parametrize("s, expected", POSTFIX_CASES)
+def test_pause_postfix(s, expected):
+    assert dump(parse(s)) == expected
+    assert dump(parse(s, interner = Interner())) == expected
+
+
+def test_pause_postfix_leaves_shared_events_alone():
+    interner = Interner()
+    (plain,) = parse_lines("* a/", interner = interner)
+    (paused,) = parse_lines("* a^1b/", interner = interner)
+    assert dump(paused)[:2] == [("TextEvent", "* ab"), ("PauseEvent", 1)]
+    # The "* a" it started from is the one the first line uses, and it didn't change.
+    assert plain[0].data == "* a"
+    assert to_tobyscript(plain) == "* a/"
+    assert to_tobyscript(paused) == "* a^1b/"
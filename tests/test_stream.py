@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from tobyscript.lib.script import PauseEvent, SoundEvent, WaitEvent, parse
+from tobyscript.lib.stream import Session, load_test, play, steps
+
+DELAY = 0.02
+
+
+async def collect(frames) -> list[tuple[float, dict]]:
+    """Every frame, along with how long after starting it arrived."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    return [(loop.time() - start, frame) async for frame in frames]
+
+
+def test_steps():
+    # "^1" also pulls the character after it in front of the pause.
+    events = parse(R"* a^1 b\S-c\Spd/")
+    assert isinstance(events[1], PauseEvent)
+    assert list(steps(events, DELAY)) == [
+        (DELAY, "*", None, "beep"),
+        (DELAY, " ", None, None),
+        (DELAY, "a", None, "beep"),
+        (DELAY, " ", None, None),
+        (DELAY * 11, "b", None, "beep"),
+        (0.0, "", events[3], None),
+        (DELAY, "c", None, None),
+        (0.0, "", events[5], "phone"),
+        (DELAY, "d", None, None),
+        (0.0, "", events[7], None)
+    ]
+    assert isinstance(events[3], SoundEvent) and isinstance(events[5], SoundEvent)
+
+
+@pytest.mark.parametrize("speed", [1.0, 2.0])
+def test_play_schedule(speed):
+    events = parse("* a^1 b/")
+    received = asyncio.run(collect(play(events, speed, delay_per_character = DELAY)))
+    frames = [frame for _, frame in received]
+
+    assert "".join(frame["text"] for frame in frames) == "* a b"
+    assert [frame["event"] for frame in frames if frame["event"]] == [events[-1]]
+    # Each character is due one delay after the last, and "b" after the pause too.
+    due = {frame["text"][0]: frame["time"] for frame in frames if frame["text"]}
+    assert due["*"] == pytest.approx(DELAY / speed)
+    assert frames[-1]["time"] == pytest.approx(DELAY * 15 / speed)
+    assert all(frame["sound"] == ("beep" if frame["text"][0] != " " else None) for frame in frames if frame["text"])
+    # Nothing arrives before it's due (give or take the clock's resolution.)
+    assert all(at >= frame["time"] - 0.005 for at, frame in received)
+    assert received[-1][0] >= DELAY * 15 / speed - 0.005
+
+
+def test_tick_sends_characters_early():
+    events = parse("* abc/")
+    received = asyncio.run(collect(play(events, tick = 1.0, delay_per_character = DELAY)))
+    (text_at, text), (wait_at, wait) = received
+    assert text["text"] == "* abc"
+    assert text["time"] == pytest.approx(DELAY)
+    # It goes out as soon as the first character is due, well before "c" is.
+    assert text_at < DELAY * 5
+    assert isinstance(wait["event"], WaitEvent)
+    assert wait_at >= DELAY * 5 - 0.005
+
+
+def test_session_blocks_until_advance():
+    async def run():
+        session = Session(parse("* a/* b/"), delay_per_character = DELAY)
+        frames = []
+
+        async def client():
+            async for frame in session:
+                frames.append(frame)
+
+        task = asyncio.create_task(client())
+        await asyncio.sleep(DELAY * 10)
+        # Stuck on the first WaitEvent.
+        assert "".join(frame["text"] for frame in frames) == "* a"
+        assert isinstance(frames[-1]["event"], WaitEvent)
+        assert not task.done()
+
+        session.advance()
+        await asyncio.sleep(DELAY * 10)
+        assert "".join(frame["text"] for frame in frames) == "* a* b"
+        # The line ends on a WaitEvent too, so playback only finishes after another advance().
+        assert not task.done()
+        session.advance()
+        await asyncio.wait_for(task, 1.0)
+        # Times after a wait count from when it was advanced.
+        assert frames[-1]["time"] >= DELAY * 10
+
+    asyncio.run(run())
+
+
+def test_cancel_ends_cleanly():
+    async def run():
+        frames = play(parse("* " + "a" * 100 + "/"), delay_per_character = DELAY)
+        received = []
+
+        async def client():
+            async for frame in frames:
+                received.append(frame)
+
+        task = asyncio.create_task(client())
+        await asyncio.sleep(DELAY * 3.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert 0 < len(received) < 10
+        # The cancellation went through the generator (it was asleep inside it), so it's finished too.
+        with pytest.raises(StopAsyncIteration):
+            await anext(frames)
+
+    asyncio.run(run())
+
+
+def test_aclose():
+    async def run():
+        frames = play(parse("* hello/"), delay_per_character = DELAY)
+        first = await anext(frames)
+        assert first["text"] == "*"
+        await frames.aclose()
+        with pytest.raises(StopAsyncIteration):
+            await anext(frames)
+
+    asyncio.run(run())
+
+
+def test_load_test():
+    stats = asyncio.run(load_test(sessions = 50, speed = 10.0, limit = 2))
+    assert stats["frames"] > 0
+    assert stats["per_session"] > 0
+    # Generous, so a busy machine doesn't fail it; it's about 5ms at 200 sessions.
+    assert stats["p99"] < 0.25
@@ -0,0 +1,67 @@
+import importlib.resources as pkg_resources
+
+import pytest
+from hypothesis import assume, given, strategies as st
+
+import tobyscript.data
+import tobyscript.lib.script as script
+from tobyscript.lib.script import (Substitution, forward_substitution, one_way_replacements, parse_lines,
+                                   replace_sequential, replacements, reverse_substitution, to_tobyscript)
+
+# Mostly the characters that the replacement keys are made of, so the keys (and near misses) come up often.
+KEY_CHARS = "\\[]CIG12>&*ZXAD z4∞\n"
+text = st.text(alphabet = st.sampled_from(KEY_CHARS) | st.characters(), max_size = 40)
+values = st.text(alphabet = st.sampled_from(KEY_CHARS) | st.characters(), max_size = 6)
+# Values that can finish a key whose start comes before them, but can't start one; these mostly take the single-scan path.
+plain_values = st.builds(str.__add__, st.sampled_from(["", "]", "1]", "2]", "C]", "I]", "G]", "[C]", "1", "C", ">1"]),
+                         st.text(alphabet = "az ", min_size = 1, max_size = 3))
+
+
+def sequential(s: str, *args: str) -> str:
+    return replace_sequential(replace_sequential(s, replacements), one_way_replacements(*args))
+
+def old_reverse(s: str) -> str:
+    for old, new in replacements:
+        s = s.replace(new, old)
+    return s
+
+
+@given(text, values, values, values, values, values)
+def test_forward_matches_sequential(s, char_name, item, g, one, two):
+    args = (char_name, item, g, one, two)
+    assert forward_substitution(*args)(s) == sequential(s, *args)
+
+
+@given(text, plain_values, plain_values, plain_values, plain_values, plain_values)
+def test_single_scan_matches_sequential(s, char_name, item, g, one, two):
+    args = (char_name, item, g, one, two)
+    substitute = forward_substitution(*args)
+    assume(isinstance(substitute, Substitution))
+    assert substitute(s) == sequential(s, *args)
+
+
+def test_default_settings_use_single_scan():
+    assert isinstance(forward_substitution("Player", "Monster Candy", "0", "0", "0"), Substitution)
+
+
+def test_backslash_in_value_falls_back():
+    assert not isinstance(forward_substitution("\\", "Monster Candy", "0", "0", "0"), Substitution)
+
+
+@given(text)
+def test_reverse_matches_old_loop(s):
+    assert reverse_substitution(s) == old_reverse(s)
+
+
+@pytest.mark.parametrize("name", ["ma.txt", "true_lab.txt"])
+def test_data_files_unchanged(monkeypatch, name):
+    with pkg_resources.open_text(tobyscript.data, name) as f:
+        s = f.read()
+
+    def dump(event_lists):
+        return [([(type(e), e.data) for e in events], to_tobyscript(events)) for events in event_lists]
+
+    new = dump(parse_lines(s))
+    monkeypatch.setattr(script, "forward_substitution", lambda *args: lambda s: sequential(s, *args))
+    monkeypatch.setattr(script, "reverse_substitution", old_reverse)
+    assert new == dump(parse_lines(s))
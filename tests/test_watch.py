@@ -0,0 +1,220 @@
+import pytest
+
+import tobyscript.lib.watch
+from tobyscript.lib.script import parse
+from tobyscript.lib.watch import ScriptWatcher, same_events
+
+
+@pytest.fixture
+def parsed(monkeypatch) -> list[str]:
+    """Record every line `ScriptWatcher` parses."""
+    lines = []
+
+    def counting_parse(line, **kwargs):
+        lines.append(line)
+        return parse(line, **kwargs)
+
+    monkeypatch.setattr(tobyscript.lib.watch, "parse", counting_parse)
+    return lines
+
+
+def make_watcher(tmp_path, lines: list[str]) -> ScriptWatcher:
+    path = tmp_path / "script.txt"
+    path.write_text("".join(lines), encoding = "utf-8")
+    watcher = ScriptWatcher(path)
+    watcher.load()
+    return watcher
+
+
+def rewrite(watcher: ScriptWatcher, lines: list[str]) -> list[int]:
+    with open(watcher.path, "w", encoding = "utf-8") as f:
+        f.write("".join(lines))
+    return watcher.reload()
+
+
+LINES = [f"* line {i}/\n" for i in range(10)]
+
+
+def check(watcher: ScriptWatcher, lines: list[str]):
+    assert watcher.lines == lines
+    assert all(same_events(e, parse(line)) for e, line in zip(watcher.events, lines, strict = True))
+
+
+def test_edit(tmp_path, parsed):
+    watcher = make_watcher(tmp_path, LINES)
+    old = list(watcher.events)
+    parsed.clear()
+
+    new = LINES.copy()
+    new[4] = "* edited/\n"
+    remap = rewrite(watcher, new)
+
+    assert remap == list(range(10))
+    assert parsed == ["* edited/\n"]
+    assert all(watcher.events[i] is old[i] for i in range(10) if i != 4)
+    check(watcher, new)
+
+
+def test_insert(tmp_path, parsed):
+    watcher = make_watcher(tmp_path, LINES)
+    old = list(watcher.events)
+    parsed.clear()
+
+    new = LINES[:3] + ["* new/\n", "* newer/\n"] + LINES[3:]
+    remap = rewrite(watcher, new)
+
+    assert remap == [0, 1, 2] + list(range(5, 12))
+    assert parsed == ["* new/\n", "* newer/\n"]
+    assert all(watcher.events[remap[i]] is old[i] for i in range(10))
+    check(watcher, new)
+
+
+def test_delete(tmp_path, parsed):
+    watcher = make_watcher(tmp_path, LINES)
+    old = list(watcher.events)
+    parsed.clear()
+
+    new = LINES[:2] + LINES[5:]
+    remap = rewrite(watcher, new)
+
+    # Deleted lines map to the line that took their place.
+    assert remap == [0, 1, 2, 2, 2, 2, 3, 4, 5, 6]
+    assert parsed == []
+    assert all(watcher.events[remap[i]] is old[i] for i in [0, 1, 5, 6, 7, 8, 9])
+    check(watcher, new)
+
+
+def test_shrink(tmp_path, parsed):
+    watcher = make_watcher(tmp_path, LINES)
+    old = list(watcher.events)
+    parsed.clear()
+
+    new = LINES[:6]
+    remap = rewrite(watcher, new)
+
+    # Lines past the new end map past it, too; callers clamp.
+    assert remap == [0, 1, 2, 3, 4, 5, 6, 6, 6, 6]
+    assert parsed == []
+    assert all(watcher.events[i] is old[i] for i in range(6))
+    check(watcher, new)
+
+
+def test_edit_and_move(tmp_path, parsed):
+    watcher = make_watcher(tmp_path, LINES)
+    old = list(watcher.events)
+    parsed.clear()
+
+    new = ["* first/\n"] + LINES[:7] + ["* changed/\n"] + LINES[8:]
+    remap = rewrite(watcher, new)
+
+    assert remap == [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+    assert parsed == ["* first/\n", "* changed/\n"]
+    assert all(watcher.events[remap[i]] is old[i] for i in range(10) if i != 7)
+    check(watcher, new)
+
+
+def test_the_same_list_is_patched(tmp_path):
+    watcher = make_watcher(tmp_path, LINES)
+    lines, events = watcher.lines, watcher.events
+    rewrite(watcher, LINES[1:])
+    assert watcher.lines is lines
+    assert watcher.events is events
+
+
+def test_interner_does_not_grow_forever(tmp_path):
+    watcher = make_watcher(tmp_path, LINES)
+    old = list(watcher.events)
+    live = len(watcher.interner.events)
+
+    new = LINES.copy()
+    for n in range(200):
+        new[4] = f"* edit {n}/\n"
+        rewrite(watcher, new)
+        assert len(watcher.interner.events) <= 2 * live + 1
+
+    # Rebuilding the interner doesn't touch the events, and they're still the shared ones.
+    assert all(watcher.events[i] is old[i] for i in range(10) if i != 4)
+    assert all(watcher.interner.event(e) is e for events in watcher.events for e in events)
+    check(watcher, new)
+
+
+def test_poll_only_reloads_on_change(tmp_path):
+    watcher = make_watcher(tmp_path, LINES)
+    assert watcher.poll(1.0) is None
+    assert watcher.poll(0.1) is None
+
+
+class FakeDocument:
+    def __init__(self, text: str = ""):
+        self.text = text
+
+    def delete_text(self, start: int, end: int):
+        self.text = self.text[:start] + self.text[end:]
+
+
+class FakeLabel:
+    text = ""
+
+
+def make_view(watcher: ScriptWatcher, line_index: int, played: int):
+    """A `ScreenView` partway through `line_index`, without a window."""
+    screen = pytest.importorskip("tobyscript.views.screen")
+    view = screen.ScreenView.__new__(screen.ScreenView)
+    view.watcher = watcher
+    view.lines = watcher.lines
+    view.line_index = line_index
+    view.current_line = watcher.lines[line_index]
+    view._line_events = watcher.events[line_index]
+    view.text_events = list(view._line_events[played:])
+    view.document = FakeDocument("typed so far")
+    view.debug_label = FakeLabel()
+    view._current_string = ""
+    view._current_pause = 0
+    view.paused = True
+    return view
+
+
+def test_view_follows_moved_line(tmp_path):
+    watcher = make_watcher(tmp_path, LINES)
+    view = make_view(watcher, 5, 1)
+    events = view.text_events
+    view.on_script_changed(rewrite(watcher, ["* first/\n"] + LINES))
+    assert view.line_index == 6
+    assert view.current_line == LINES[5]
+    assert view.text_events is events
+    assert view.document.text == "typed so far"
+
+
+def test_view_keeps_position_when_later_events_change(tmp_path):
+    lines = ["* a\\Yb/\n"] * 3
+    watcher = make_watcher(tmp_path, lines)
+    view = make_view(watcher, 1, 2)
+    new = lines.copy()
+    new[1] = "* a\\Yc/\n"
+    view.on_script_changed(rewrite(watcher, new))
+    assert view.line_index == 1
+    assert view._line_events is watcher.events[1]
+    assert same_events(view.text_events, parse("* a\\Yc/")[2:])
+    assert view.document.text == "typed so far"
+    assert view.paused
+
+
+def test_view_replays_line_when_played_events_change(tmp_path):
+    lines = ["* a\\Yb/\n"] * 3
+    watcher = make_watcher(tmp_path, lines)
+    view = make_view(watcher, 1, 2)
+    new = lines.copy()
+    new[1] = "* z\\Yb/\n"
+    view.on_script_changed(rewrite(watcher, new))
+    assert view.line_index == 1
+    assert same_events(view.text_events, parse("* z\\Yb/"))
+    assert view.document.text == ""
+    assert not view.paused
+
+
+def test_view_clamps_when_file_shrinks(tmp_path):
+    watcher = make_watcher(tmp_path, LINES)
+    view = make_view(watcher, 8, 1)
+    view.on_script_changed(rewrite(watcher, LINES[:4]))
+    assert view.line_index == 3
+    assert same_events(view.text_events, parse(LINES[3]))
@@ -0,0 +1,132 @@
+import argparse
+import importlib.resources as pkg_resources
+import os
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+import tobyscript.data
+from tobyscript.lib.script import Event, Settings, WaitEvent, parse, settings
+from tobyscript.lib.stream import DELAY_PER_CHARACTER, Sound, steps
+
+SOUNDS: dict[Sound, str] = {
+    "beep": "snd_txt1.wav",
+    "phone": "snd_phone.wav"
+}
+
+
+def read_wav(f) -> tuple[np.ndarray, int]:
+    """Read a 16-bit PCM WAV into a `(frames, channels)` float32 array. Returns the array and the sample rate."""
+    with wave.open(f, "rb") as w:
+        if w.getsampwidth() != 2:
+            raise ValueError(f"Only 16-bit WAVs are supported, not {w.getsampwidth() * 8}-bit.")
+        samples = np.frombuffer(w.readframes(w.getnframes()), dtype = "<i2")
+        return samples.reshape(-1, w.getnchannels()).astype(np.float32), w.getframerate()
+
+def write_wav(path: str | os.PathLike, samples: np.ndarray, rate: int):
+    """Write a `(frames, channels)` array as a 16-bit PCM WAV, clipping anything out of range."""
+    pcm = np.clip(np.rint(samples), -32768, 32767).astype("<i2")
+    with wave.open(os.fspath(path), "wb") as w:
+        w.setnchannels(pcm.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+
+@cache
+def sound(name: Sound) -> tuple[np.ndarray, int]:
+    with pkg_resources.open_binary(tobyscript.data, SOUNDS[name]) as f:
+        return read_wav(f)
+
+
+def render(events: Iterable[Event], speed: float = 1.0, *, wait: float = 0.5,
+           delay_per_character: float = DELAY_PER_CHARACTER) -> tuple[np.ndarray, int]:
+    """Render the text beeps and sound effects for a list of `Event`s, timed the way `ScreenView` plays them.
+
+    * `wait`: how many seconds of silence to leave for each `WaitEvent`, since there's no one to press a key.
+
+    Returns a `(frames, channels)` float32 array and its sample rate."""
+    beep, rate = sound("beep")
+    for name in SOUNDS:
+        samples, r = sound(name)
+        if r != rate or samples.shape[1] != beep.shape[1]:
+            raise ValueError(f"{SOUNDS[name]} is {r} Hz with {samples.shape[1]} channel(s), but {SOUNDS['beep']} is "
+                             f"{rate} Hz with {beep.shape[1]}; all sounds need the same format to be mixed.")
+
+    starts: dict[Sound, list[float]] = {name: [] for name in SOUNDS}
+    t = 0.0
+    for delay, _, event, s in steps(events, delay_per_character):
+        t += delay / speed
+        if s is not None:
+            starts[s].append(t)
+        if isinstance(event, WaitEvent):
+            t += wait / speed
+
+    end = int(np.ceil(t * rate))
+    offsets = {name: np.rint(np.array(times) * rate).astype(np.int64) for name, times in starts.items()}
+    for name, o in offsets.items():
+        if o.size:
+            end = max(end, int(o[-1]) + len(sound(name)[0]))
+
+    out = np.zeros((end, beep.shape[1]), dtype = np.float32)
+    for name, o in offsets.items():
+        samples = sound(name)[0]
+        # Each copy is already one contiguous vectorized add, which beats an FFT or an index matrix here.
+        for offset in o:
+            out[offset:offset + len(samples)] += samples
+    return out, rate
+
+
+def _render_line(job: tuple[str, str, float, Settings]) -> Optional[str]:
+    line, path, speed, job_settings = job
+    # Worker processes don't share the parent's settings if they weren't forked.
+    settings.update(job_settings)
+    events = parse(line)
+    if not events:
+        return None
+    samples, rate = render(events, speed)
+    write_wav(path, samples, rate)
+    return path
+
+def render_corpus(paths: Iterable[str | os.PathLike], out_dir: str | os.PathLike, speed: float = 1.0, *,
+                  processes: Optional[int] = None) -> list[str]:
+    """Render one WAV per non-empty line of every TobyScript file in `paths`, across `processes` worker processes.
+
+    Files are written to `out_dir` as `<file name>-<line number>.wav`, in the same folders relative to `out_dir`
+    as the scripts are relative to the folder they all share. Returns the paths written.
+    Raises `ValueError` if two scripts in one folder have the same name apart from their extension."""
+    out_dir = Path(out_dir)
+    # Giving the same file twice would have two workers writing the same WAVs.
+    paths = list(dict.fromkeys(Path(path).resolve() for path in paths))
+    if not paths:
+        return []
+    root = Path(os.path.commonpath([path.parent for path in paths]))
+
+    jobs = []
+    stems: dict[Path, Path] = {}
+    for path in paths:
+        stem = out_dir / path.parent.relative_to(root) / path.stem
+        if stem in stems:
+            raise ValueError(f"{stems[stem]} and {path} would both be rendered to {stem}-*.wav.")
+        stems[stem] = path
+        stem.parent.mkdir(parents = True, exist_ok = True)
+        with open(path, encoding = "utf-8") as f:
+            for n, line in enumerate(f, start = 1):
+                jobs.append((line, f"{stem}-{n:04}.wav", speed, dict(settings)))
+
+    with ProcessPoolExecutor(processes) as executor:
+        return [p for p in executor.map(_render_line, jobs, chunksize = 16) if p is not None]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog = "python -m tobyscript.lib.audio", description = "Render TobyScript dialogue audio to WAV files.")
+    parser.add_argument("files", nargs = "+")
+    parser.add_argument("-o", "--out", default = "audio")
+    parser.add_argument("-s", "--speed", type = float, default = 1.0)
+    parser.add_argument("-j", "--processes", type = int, default = None)
+    args = parser.parse_args()
+    written = render_corpus(args.files, args.out, args.speed, processes = args.processes)
+    print(f"Wrote {len(written)} files to {args.out}")
@@ -0,0 +1,56 @@
+import gc
+import importlib.resources as pkg_resources
+import os
+import tracemalloc
+from typing import Iterable, Optional
+
+import tobyscript.data
+from tobyscript.lib.script import Event, Interner, parse_lines
+
+
+def load_corpus(paths: Iterable[str | os.PathLike], *, interner: Optional[Interner] = None) -> dict[str, list[list[Event]]]:
+    """Parse every TobyScript file in `paths`, one list of `Event`s per line.
+
+    All files share one `Interner` (a new one, if `interner` isn't given), so repeated text and events across
+    the whole corpus are only stored once."""
+    if interner is None:
+        interner = Interner()
+    corpus = {}
+    for path in paths:
+        with open(path, encoding = "utf-8") as f:
+            corpus[os.fspath(path)] = parse_lines(f.read(), interner = interner)
+    return corpus
+
+
+def measure(s: str, interner: Optional[Interner]) -> tuple[int, list[list[Event]]]:
+    """Parse `s`, and return how many bytes the result (and `interner`) takes up, along with the result."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    events = parse_lines(s, interner = interner)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, events
+
+
+def report(copies: int = 100):
+    """Print how much memory interning saves when parsing `copies` copies of `true_lab.txt`."""
+    with pkg_resources.open_text(tobyscript.data, "true_lab.txt") as f:
+        s = f.read() * copies
+
+    plain, plain_events = measure(s, None)
+    del plain_events
+    interner = Interner()
+    interned, interned_events = measure(s, interner)
+
+    lines = len(interned_events)
+    events = sum(len(e) for e in interned_events)
+    print(f"{copies} copies of true_lab.txt: {lines} lines, {events} events, "
+          f"{len(interner.events)} distinct events, {len(interner.strings)} distinct strings")
+    print(f"plain:    {plain / 1024:9.1f} KiB")
+    print(f"interned: {interned / 1024:9.1f} KiB ({1 - interned / plain:.0%} saved)")
+
+
+if __name__ == "__main__":
+    report()
@@ -0,0 +1,201 @@
+import array
+import bisect
+import os
+import pickle
+import re
+import unicodedata
+from typing import Optional, TypedDict
+
+from tobyscript.lib.script import ColorEvent, EmotionEvent, Event, FaceEvent, SpeakerEvent, TextEvent, parse_lines
+
+# (file, line, event offset)
+Posting = tuple[str, int, int]
+# (speaker, face, emotion, color)
+State = tuple[str, Optional[str], int, Optional[str]]
+
+INDEX_VERSION = 2
+# What `ScreenView` resets to at the start of every line.
+DEFAULT_STATE: State = ("Default", None, 0, "white")
+
+token_re = re.compile(r"\w+(?:'\w+)*")
+
+
+class FileEntry(TypedDict):
+    """
+    * `mtime`: the modification time of the file when it was indexed
+    * `split_on`: the `split_on` the file was indexed with
+    * `states`: every distinct `State` that was active at the start of some token in the file
+    * `tokens`: token -> flat `array` of `line, event offset, token position, index into states` for each occurrence
+    """
+    mtime: float
+    split_on: Optional[str]
+    states: list[State]
+    tokens: dict[str, array.array]
+
+
+def normalize(s: str) -> str:
+    """Normalize (NFKC, casefold) a plain-text string."""
+    return unicodedata.normalize("NFKC", s).casefold()
+
+def tokenize(s: str) -> list[str]:
+    """Split a plain-text string into normalized tokens."""
+    return token_re.findall(normalize(s))
+
+def tokenize_events(events: list[Event]) -> list[tuple[str, int, State]]:
+    """Return the normalized tokens in a parsed line, each paired with the offset of the `TextEvent` it starts in
+    and the speaker, face, emotion, and color active at that event.
+
+    Text is joined across events first, so a word split by a color or pause code is still one token."""
+    speaker, face, emotion, color = DEFAULT_STATE
+    starts: list[int] = []
+    offsets: list[int] = []
+    states: list[State] = []
+    text = ""
+    for n, e in enumerate(events):
+        if isinstance(e, TextEvent):
+            starts.append(len(text))
+            offsets.append(n)
+            states.append((speaker, face, emotion, color))
+            # Normalize each piece on its own, since normalizing can change the length of the text.
+            text += normalize(e.data)
+        elif isinstance(e, SpeakerEvent):
+            speaker = e.speaker
+        elif isinstance(e, FaceEvent):
+            face = e.character
+        elif isinstance(e, EmotionEvent):
+            emotion = e.data
+        elif isinstance(e, ColorEvent):
+            color = e.name
+    tokens = []
+    for m in token_re.finditer(text):
+        i = bisect.bisect_right(starts, m.start()) - 1
+        tokens.append((m.group(), offsets[i], states[i]))
+    return tokens
+
+
+class SearchIndex:
+    def __init__(self):
+        """An inverted index over parsed TobyScript files.
+
+        Maps normalized plain-text tokens to `(file, line, event offset)` postings, where `line` is 1-based
+        and `event offset` is the index of the `TextEvent` in `parse(line)` the token starts in.
+        Each posting also remembers the speaker, face, emotion, and color active where it starts, to filter on."""
+        self.files: dict[str, FileEntry] = {}
+        self._token_files: dict[str, set[str]] = {}
+
+    def _link(self, path: str):
+        for token in self.files[path]["tokens"]:
+            self._token_files.setdefault(token, set()).add(path)
+
+    def _unlink(self, path: str):
+        for token in self.files[path]["tokens"]:
+            files = self._token_files[token]
+            files.discard(path)
+            if not files:
+                del self._token_files[token]
+
+    def index_text(self, path: str, s: str, mtime: float = 0.0, *, split_on: Optional[str] = None):
+        """Index (or reindex) the TobyScript string `s` under the name `path`."""
+        tokens: dict[str, array.array] = {}
+        states: dict[State, int] = {}
+        for line, events in enumerate(parse_lines(s, split_on = split_on), start = 1):
+            for pos, (token, offset, state) in enumerate(tokenize_events(events)):
+                a = tokens.get(token)
+                if a is None:
+                    a = tokens[token] = array.array("I")
+                a.extend((line, offset, pos, states.setdefault(state, len(states))))
+
+        if path in self.files:
+            self._unlink(path)
+        self.files[path] = {"mtime": mtime, "split_on": split_on, "states": list(states), "tokens": tokens}
+        self._link(path)
+
+    def add_file(self, path: str | os.PathLike, *, split_on: Optional[str] = None) -> bool:
+        """Index a file if it is new or has changed since it was last indexed. Returns whether it was (re)indexed.
+
+        If `split_on` is `None` and the file was indexed before, it's split the same way as last time."""
+        path = os.fspath(path)
+        mtime = os.stat(path).st_mtime
+        entry = self.files.get(path)
+        if entry is not None:
+            if split_on is None:
+                split_on = entry["split_on"]
+            if entry["mtime"] == mtime and entry["split_on"] == split_on:
+                return False
+        with open(path, encoding = "utf-8") as f:
+            self.index_text(path, f.read(), mtime, split_on = split_on)
+        return True
+
+    def remove_file(self, path: str | os.PathLike):
+        path = os.fspath(path)
+        if path in self.files:
+            self._unlink(path)
+            del self.files[path]
+
+    def refresh(self) -> list[str]:
+        """Reindex every changed file and drop every deleted one. Returns the paths that changed."""
+        changed = []
+        for path in list(self.files):
+            if not os.path.exists(path):
+                self.remove_file(path)
+                changed.append(path)
+            elif self.add_file(path):
+                changed.append(path)
+        return changed
+
+    def search(self, query: str, *, speaker: Optional[str] = None, face: Optional[str] = None,
+               emotion: Optional[int] = None, color: Optional[str] = None) -> list[Posting]:
+        """Find every occurrence of the phrase `query`.
+
+        If any of `speaker`, `face`, `emotion`, or `color` are given, only match where they are active at the start of
+        the phrase. A line starts out with the `"Default"` speaker, no face, emotion 0, and white text, like in `ScreenView`.
+
+        Returns `(file, line, event offset)` postings of the first token of each match, in file and line order."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        filters = [(n, value) for n, value in enumerate((speaker, face, emotion, color)) if value is not None]
+
+        try:
+            paths = set.intersection(*(self._token_files[t] for t in tokens))
+        except KeyError:
+            return []
+
+        results: list[Posting] = []
+        for path in sorted(paths):
+            allowed: Optional[set[int]] = None
+            if filters:
+                allowed = {n for n, state in enumerate(self.files[path]["states"])
+                           if all(state[i] == value for i, value in filters)}
+                if not allowed:
+                    continue
+
+            # Scan the flat arrays directly; the first token's are already in line and position order.
+            # The other tokens only need their (line, position) pairs, to check they follow it,
+            # and only on lines that the rarest token is on.
+            first, *others = arrays = [self.files[path]["tokens"][t] for t in tokens]
+            lines = set(min(arrays, key = len)[0::4]) if others else None
+            rest = [{(line, pos) for line, pos in zip(a[0::4], a[2::4]) if line in lines} for a in others]
+            for line, offset, pos, state in zip(first[0::4], first[1::4], first[2::4], first[3::4]):
+                if (lines is not None and line not in lines) or (allowed is not None and state not in allowed):
+                    continue
+                if all((line, pos + n) in r for n, r in enumerate(rest, start = 1)):
+                    results.append((path, line, offset))
+        return results
+
+    def save(self, path: str | os.PathLike):
+        """Save the index with `pickle`. Only `load()` indexes you saved yourself; unpickling can run arbitrary code."""
+        with open(path, "wb") as f:
+            pickle.dump({"version": INDEX_VERSION, "files": self.files}, f, protocol = pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "SearchIndex":
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version: {data.get('version')!r}")
+        index = cls()
+        index.files = data["files"]
+        for p in index.files:
+            index._link(p)
+        return index
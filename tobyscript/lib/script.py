@@ -1,8 +1,9 @@
 import collections.abc
+import functools
 import json
 import re
 from types import NoneType
-from typing import Literal, Optional, TypedDict, cast
+from typing import Callable, Literal, Optional, TypedDict
 
 RGB = tuple[int, int, int]
 RGBA = tuple[int, int, int, int]
@@ -52,9 +53,126 @@ replacements = [
 ]
 
 
+def replace_sequential(s: str, table: list[tuple[str, str]]) -> str:
+    """Apply each `(old, new)` replacement in `table` to the whole string, one after another."""
+    for old, new in table:
+        s = s.replace(old, new)
+    return s
+
+
+class Substitution:
+    def __init__(self, table: dict[str, str]):
+        """Replaces every key of `table` with its value in a single left-to-right scan.
+
+        Where keys overlap, the longest one wins."""
+        self.table = table
+        self.pattern = re.compile("|".join(re.escape(k) for k in sorted(table, key = len, reverse = True)))
+        # Most strings have nothing to replace, and `in` is much faster than the regex at finding that out.
+        self.first_chars = "".join({k[0] for k in table})
+
+    def _lookup(self, m: re.Match) -> str:
+        return self.table[m[0]]
+
+    def __call__(self, s: str) -> str:
+        for c in self.first_chars:
+            if c in s:
+                return self.pattern.sub(self._lookup, s)
+        return s
+
+
+def one_way_replacements(char_name: str, item: str, g: str, one: str, two: str) -> list[tuple[str, str]]:
+    return [
+        ("\\[C]", char_name),
+        ("\\[I]", item),
+        ("\\[G]", g),
+        ("\\[1]", one),
+        ("\\[2]", two),
+        ("\\>1", " "),
+        ("\\C", "")
+    ]
+
+
+def _joins(value: str, keys: list[str]) -> Optional[list[tuple[str, str]]]:
+    """Find where `value`, once substituted into a string, could complete one of `keys` together with the text to its left.
+
+    Returns `(head, key)` pairs, where `head + value` starts with `key`, or `None` if the text to the right of `value`
+    (or inside it) could be part of a match too, so no fixed set of keys can cover it."""
+    if keys and "\\" in value:
+        return None
+    found = []
+    for key in keys:
+        for n in range(1, len(key)):
+            head, tail = key[:n], key[n:]
+            if value.startswith(tail):
+                found.append((head, key))
+            elif tail.startswith(value):
+                return None
+    return found
+
+
+@functools.lru_cache(maxsize = 16)
+def forward_substitution(char_name: str, item: str, g: str, one: str, two: str) -> Callable[[str], str]:
+    """Build the function `parse` uses to apply `replacements` and then the one-way replacements.
+
+    This gives the same result as `replace_sequential`ing both tables, but in one scan.
+    Sequential passes can chain (a later pass matching text that an earlier one produced), so the scan also looks for
+    every short sequence that chains, and replaces it with whatever the sequential passes turn it into.
+    If a value could chain in a way that can't be covered like that (say, a name with a backslash in it),
+    this falls back to the sequential passes."""
+    one_way = one_way_replacements(char_name, item, g, one, two)
+    one_way_keys = [old for old, _ in one_way]
+
+    def sequential(s: str) -> str:
+        return replace_sequential(replace_sequential(s, replacements), one_way)
+
+    # Text that, just before a one-way key, joins up with its value to make a later key.
+    prefixes: dict[str, list[str]] = {}
+    for n, (old, new) in enumerate(one_way):
+        joins = _joins(new, one_way_keys[n + 1:])
+        if joins is None:
+            return sequential
+        prefixes[old] = []
+        for head, key in joins:
+            # Only follow one link; if that key's value can chain again, give up.
+            m = one_way_keys.index(key)
+            if _joins(one_way[m][1], one_way_keys[m + 1:]) != []:
+                return sequential
+            prefixes[old].append(head)
+
+    keys = [old for old, _ in replacements] + one_way_keys
+    keys += [head + old for old, heads in prefixes.items() for head in heads]
+    for old, new in replacements:
+        joins = _joins(new, one_way_keys)
+        if joins is None:
+            return sequential
+        for head, key in joins:
+            keys += [prefix + head + old for prefix in ["", *prefixes[key]]]
+
+    return Substitution({k: sequential(k) for k in keys})
+
+
+# Serialization only ever goes one way through `replacements`, and no output can chain into another key.
+reverse_substitution = Substitution({new: old for old, new in reversed(replacements)})
+
+
 class Event:
+    __slots__ = ("data",)
+
     def __init__(self, data: str | int | None = None):
-        self.data = data
+        # Events are immutable, so that identical ones can be shared between lists (see `Interner`.)
+        object.__setattr__(self, "data", data)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __getstate__(self) -> tuple:
+        return (self.data,)
+
+    def __setstate__(self, state: tuple):
+        object.__setattr__(self, "data", state[0])
 
     def __str__(self) -> str:
         data = repr(self.data) if self.data is not None else ''
@@ -69,29 +187,33 @@ class Event:
         raise NotImplementedError
 
 class TextEvent(Event):
+    __slots__ = ()
+    data: str
+
     def __init__(self, data: str):
         """Represents text to display on the screen."""
         super().__init__(data)
-        self.data = cast(str, self.data)
 
     @property
     def tobyscript(self) -> str:
-        s = self.data
-        for old, new in replacements:
-            s = s.replace(new, old)
-        return s
+        return reverse_substitution(self.data)
 
 class PauseEvent(Event):
+    __slots__ = ()
+    data: int
+
     def __init__(self, data: int):
         """Delays an amount of time before continuing."""
         super().__init__(data)
-        self.data = cast(int, self.data)
 
     @property
     def tobyscript(self) -> str:
         return f"^{self.data}"
 
 class ColorEvent(Event):
+    __slots__ = ()
+    data: str
+
     NAME_MAP = {"R": "red",
                 "G": "green",
                 "W": "white",
@@ -120,7 +242,6 @@ class ColorEvent(Event):
         * `self.rgb`: `tuple` - the color as an RGB tuple (as rendered in Undertale).
         """
         super().__init__(data)
-        self.data = cast(str, self.data)
 
     @property
     def name(self) -> str | None:
@@ -145,6 +266,9 @@ class ColorEvent(Event):
         return f"\\{self.data}"
 
 class EmotionEvent(Event):
+    __slots__ = ()
+    data: int
+
     def __init__(self, data: int):
         """Denotes an emotion for the character on screen (if any) to display."""
         super().__init__(data)
@@ -154,6 +278,9 @@ class EmotionEvent(Event):
         return f"\\E{self.data}"
 
 class FaceEvent(Event):
+    __slots__ = ()
+    data: int
+
     FACE_MAP = {
         0: None,
         1: "Toriel",
@@ -170,7 +297,6 @@ class FaceEvent(Event):
     def __init__(self, data: int):
         """Denotes a character's face to display on screen."""
         super().__init__(data)
-        self.data = cast(int, self.data)
 
     @property
     def character(self) -> str:
@@ -181,16 +307,21 @@ class FaceEvent(Event):
         return f"\\F{self.data}"
 
 class AnimationEvent(Event):
+    __slots__ = ()
+    data: int
+
     def __init__(self, data: int):
         """Denotes an animation. Hard to know what this means in context of the game."""
         super().__init__(data)
-        self.data = cast(int, self.data)
 
     @property
     def tobyscript(self) -> str:
         return f"\\M{self.data}"
 
 class SoundEvent(Event):
+    __slots__ = ()
+    data: Literal["-", "+", "p"]
+
     def __init__(self, data: str):
         """Manipulate the current sound in some way.
 
@@ -200,7 +331,6 @@ class SoundEvent(Event):
             - `phone`: play phone sfx
         """
         super().__init__(data)
-        self.data = cast(Literal["-", "+", "p"], self.data)
 
     @property
     def type(self) -> str:
@@ -219,12 +349,14 @@ class SoundEvent(Event):
         return f"\\S{self.data}"
 
 class TextSizeEvent(Event):
+    __slots__ = ()
+    data: str
+
     def __init__(self, data: str):
         """Change the upcoming text size.
 
         `self.small`: `bool` - whether or not we're changing the text size to small (or normal, if False.)"""
         super().__init__(data)
-        self.data = cast(str, self.data)
 
     @property
     def small(self) -> bool:
@@ -235,6 +367,9 @@ class TextSizeEvent(Event):
         return f"\\T{self.data}"
 
 class SpeakerEvent(Event):
+    __slots__ = ()
+    data: str
+
     SPEAKER_MAP = {"T": "Toriel",
         "t": "Toriel (Sans)",
         "0": "Default",
@@ -254,7 +389,6 @@ class SpeakerEvent(Event):
         * `self.speaker`: the name of the speaker (as listed in Undertale Dialog Simulator.)
         """
         super().__init__(data)
-        self.data = cast(str, self.data)
 
     @property
     def speaker(self) -> str:
@@ -265,57 +399,75 @@ class SpeakerEvent(Event):
         return f"\\T{self.data}"
 
 class WaitEvent(Event):
+    __slots__ = ()
+    data: NoneType
+
     def __init__(self):
         """Wait for user input."""
         super().__init__()
-        self.data = cast(NoneType, self.data)
 
     @property
     def tobyscript(self) -> str:
         return "/"
 
 class SkipEvent(Event):
+    __slots__ = ()
+    data: NoneType
+
     def __init__(self):
         """Continue to the next text box (or rather, clear the current box contents.)"""
         super().__init__()
-        self.data = cast(NoneType, self.data)
 
     @property
     def tobyscript(self) -> str:
         return "%"
 
 class CloseEvent(Event):
+    __slots__ = ()
+    data: NoneType
+
     def __init__(self):
         """Close the current text box. (Usually denotes the end of an interaction, but not always!)"""
         super().__init__()
-        self.data = cast(NoneType, self.data)
 
     @property
     def tobyscript(self) -> str:
         return "%%"
 
 
-def parse(s: str) -> list[Event]:
-    """Take a TobyScript string and return an ordered list of Events."""
-    events: list[Event] = []
-    current_string = ""
+class Interner:
+    def __init__(self):
+        """Shares identical strings and `Event`s between everything parsed with it.
 
-    one_way_replacements = [
-        ("\\[C]", settings["char_name"]),
-        ("\\[I]", settings["item"]),
-        ("\\[G]", settings["g"]),
-        ("\\[1]", settings["one"]),
-        ("\\[2]", settings["two"]),
-        ("\\>1", " "),
-        ("\\C", "")
-    ]
+        * `self.strings`: `dict[str, str]` - every distinct text payload seen.
+        * `self.events`: `dict` - every distinct `(type, data)` pair seen, mapped to the one `Event` for it.
+        """
+        self.strings: dict[str, str] = {}
+        self.events: dict[tuple[type, str | int | None], Event] = {}
 
-    for old, new in replacements:
-        s = s.replace(old, new)
-    for old, new in one_way_replacements:
-        s = s.replace(old, new)
+    def string(self, s: str) -> str:
+        return self.strings.setdefault(s, s)
+
+    def event(self, e: Event) -> Event:
+        """Return the shared `Event` with the same type and data as `e`."""
+        data = self.string(e.data) if isinstance(e.data, str) else e.data
+        shared = self.events.get((type(e), data))
+        if shared is None:
+            if data is not e.data:
+                e = type(e)(data)
+            shared = self.events[(type(e), data)] = e
+        return shared
+
+
+def parse(s: str, *, interner: Optional[Interner] = None) -> list[Event]:
+    """Take a TobyScript string and return an ordered list of Events.
+
+    * interner: `Interner` - if given, identical events are shared with everything else parsed with it."""
+    events: list[Event] = []
+    current_string = ""
 
-    s = s.rstrip()
+    substitute = forward_substitution(settings["char_name"], settings["item"], settings["g"], settings["one"], settings["two"])
+    s = substitute(s).rstrip()
 
     current_string = ""
     skip = False
@@ -337,7 +489,7 @@ def parse(s: str) -> list[Event]:
         if re.match(r"\^\d", current_string):
             # Handle the weird postfix thing
             if i != len(s) - 1 and events and isinstance(events[-1], TextEvent):
-                events[-1].data += s[i + 1]
+                events[-1] = TextEvent(events[-1].data + s[i + 1])
                 skip = True
             events.append(PauseEvent(int(current_string[1])))
             current_string = ""
@@ -371,9 +523,12 @@ def parse(s: str) -> list[Event]:
         elif current_string == "%%":
             events.append(CloseEvent())
 
+    if interner is not None:
+        events = [interner.event(e) for e in events]
     return events
 
-def parse_lines(s: str, *, split_on: Optional[str] = None, merge: Literal["none", "close", "all"] = "none") -> list[list[Event]]:
+def parse_lines(s: str, *, split_on: Optional[str] = None, merge: Literal["none", "close", "all"] = "none",
+                interner: Optional[Interner] = None) -> list[list[Event]]:
     """Parse multiple TobyScript strings into an ordered list of ordered lists of Events.
 
     * s: `str` - The lines to parse.
@@ -381,7 +536,8 @@ def parse_lines(s: str, *, split_on: Optional[str] = None, merge: Literal["none"
     * merge: `str` - One of either `'none'`, `'close'`, or `'all'`.
     `none` returns the lists split as they were by the split functions.
     `close` returns the lists delimited by `CloseEvent`s.
-    `all` returns a sequence of length 1, where all events are combined into one list."""
+    `all` returns a sequence of length 1, where all events are combined into one list.
+    * interner: `Interner` - if given, identical events are shared between lines (and with everything else parsed with it.)"""
     event_lists = []
 
     if split_on is None:
@@ -390,7 +546,7 @@ def parse_lines(s: str, *, split_on: Optional[str] = None, merge: Literal["none"
         lines = s.split(split_on)
 
     for line in lines:
-        parsed_line = parse(line)
+        parsed_line = parse(line, interner = interner)
         event_lists.append(parsed_line)
 
     if merge == "none":
@@ -0,0 +1,177 @@
+import asyncio
+import importlib.resources as pkg_resources
+import time
+import tracemalloc
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator, Literal, Optional, TypedDict
+
+import tobyscript.data
+from tobyscript.lib.script import Event, PauseEvent, SoundEvent, TextEvent, WaitEvent, parse_lines
+
+DELAY_PER_CHARACTER = 1 / 30
+
+Sound = Literal["beep", "phone"]
+
+
+class Frame(TypedDict):
+    """
+    * `time`: when the frame was due, in seconds since playback started
+    * `text`: characters to type this frame (may be more than one, see `play()`)
+    * `event`: the non-text `Event` that happens this frame, if any; apply it after `text`
+    * `sound`: the sound to play this frame, if any
+    """
+    time: float
+    text: str
+    event: Optional[Event]
+    sound: Optional[Sound]
+
+
+def steps(events: Iterable[Event], delay_per_character: float = DELAY_PER_CHARACTER) -> Iterator[tuple[float, str, Optional[Event], Optional[Sound]]]:
+    """Walk a list of `Event`s the way `ScreenView` plays them.
+
+    Yields `(delay, char, event, sound)`, where `delay` is how long to wait after the previous step.
+    Each step is either one character of text (`event` is `None`), or one non-text `Event` (`char` is `""`)."""
+    sound_on = True
+    delay = 0.0
+    for event in events:
+        if isinstance(event, TextEvent):
+            for c in event.data:
+                yield delay + delay_per_character, c, None, "beep" if sound_on and c != " " else None
+                delay = 0.0
+        elif isinstance(event, PauseEvent):
+            delay += delay_per_character * event.data * 10
+        elif isinstance(event, SoundEvent):
+            if event.type == "phone":
+                yield delay, "", event, "phone"
+                delay = 0.0
+                continue
+            sound_on = event.type == "on"
+            yield delay, "", event, None
+            delay = 0.0
+        else:
+            yield delay, "", event, None
+            delay = 0.0
+
+
+async def play(events: Iterable[Event], speed: float = 1.0, *, advance: Optional[Callable[[], Awaitable[object]]] = None,
+               tick: float = 0.0, delay_per_character: float = DELAY_PER_CHARACTER) -> AsyncIterator[Frame]:
+    """Yield `Frame`s for a list of `Event`s in real time.
+
+    * `speed`: playback speed multiplier.
+    * `advance`: called and awaited after every `WaitEvent` frame, e.g. to wait for user input.
+    If `None`, `WaitEvent`s don't block.
+    * `tick`: characters due within `tick` seconds of each other are sent as one frame.
+    Raising this makes each session wake up less often, at the cost of typing in small bursts.
+    Characters that are already late are always sent together.
+
+    To stop playback, cancel the task iterating this, or `aclose()` it."""
+    loop = asyncio.get_running_loop()
+    start = deadline = loop.time()
+    text = ""
+    text_time = text_deadline = 0.0
+    text_sound: Optional[Sound] = None
+
+    for delay, char, event, sound in steps(events, delay_per_character):
+        deadline += delay / speed
+        now = loop.time()
+        if deadline > now and (deadline > text_deadline + tick or event is not None):
+            if text:
+                yield {"time": text_time, "text": text, "event": None, "sound": text_sound}
+                text, text_sound = "", None
+            await asyncio.sleep(deadline - now)
+
+        if event is None:
+            # Coalesce characters that are already due into one frame.
+            if not text:
+                text_time = deadline - start
+                text_deadline = deadline
+            text += char
+            text_sound = text_sound or sound
+            continue
+
+        if text:
+            yield {"time": text_time, "text": text, "event": None, "sound": text_sound}
+            text, text_sound = "", None
+        yield {"time": deadline - start, "text": "", "event": event, "sound": sound}
+
+        if isinstance(event, WaitEvent) and advance is not None:
+            await advance()
+            deadline = max(loop.time(), deadline)
+
+    if text:
+        yield {"time": text_time, "text": text, "event": None, "sound": text_sound}
+
+
+class Session:
+    def __init__(self, events: Iterable[Event], speed: float = 1.0, *, tick: float = 0.0, delay_per_character: float = DELAY_PER_CHARACTER):
+        """One client's playback. Iterate it with `async for` to get `Frame`s, and call `advance()` to continue past a `WaitEvent`.
+
+        See `play()` for the arguments."""
+        self.events = events
+        self.speed = speed
+        self.tick = tick
+        self.delay_per_character = delay_per_character
+        self._advanced = asyncio.Event()
+
+    def advance(self):
+        self._advanced.set()
+
+    async def _wait(self):
+        await self._advanced.wait()
+        self._advanced.clear()
+
+    def __aiter__(self) -> AsyncIterator[Frame]:
+        return play(self.events, self.speed, advance = self._wait, tick = self.tick, delay_per_character = self.delay_per_character)
+
+
+async def load_test(sessions: int = 2000, speed: float = 1.0, tick: float = 1 / 20, limit: int = 10) -> dict[str, float]:
+    """Play the first `limit` lines of `true_lab.txt` to `sessions` in-process clients at once,
+    advancing each `WaitEvent` immediately, and print timing and memory statistics.
+
+    Returns the statistics: `frames`, `wall` and `cpu` seconds, `per_session` bytes, and lateness `p50` and `p99` in seconds."""
+    with pkg_resources.open_text(tobyscript.data, "true_lab.txt") as f:
+        events = parse_lines(f.read(), merge = "all")[0]
+    events = events[:[i for i, e in enumerate(events) if isinstance(e, WaitEvent)][limit - 1] + 1]
+    expected = sum(delay for delay, *_ in steps(events)) / speed
+
+    loop = asyncio.get_running_loop()
+    lateness: list[float] = []
+    frames = 0
+
+    async def client(record: bool = True):
+        nonlocal frames
+        session = Session(events, speed, tick = tick)
+        start = loop.time()
+        async for frame in session:
+            if record:
+                frames += 1
+                lateness.append(loop.time() - start - frame["time"])
+            if isinstance(frame["event"], WaitEvent):
+                session.advance()
+
+    # Memory: start every session, let them all get going, then cancel them.
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tasks = [asyncio.create_task(client(record = False)) for _ in range(sessions)]
+    await asyncio.sleep(0.5)
+    per_session = (tracemalloc.get_traced_memory()[0] - baseline) / sessions
+    tracemalloc.stop()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions = True)
+
+    cpu = time.process_time()
+    wall = loop.time()
+    await asyncio.gather(*(client() for _ in range(sessions)))
+    wall = loop.time() - wall
+    cpu = time.process_time() - cpu
+
+    lateness.sort()
+    p50, p99 = lateness[len(lateness) // 2], lateness[int(len(lateness) * 0.99)]
+    print(f"{sessions} sessions, {frames} frames, {expected:.2f}s of dialogue each at {speed}x, tick {tick * 1000:.0f}ms")
+    print(f"wall {wall:.2f}s, cpu {cpu:.2f}s, {per_session / 1024:.1f} KiB/session")
+    print(f"lateness p50 {p50 * 1000:.1f}ms, p99 {p99 * 1000:.1f}ms")
+    return {"frames": frames, "wall": wall, "cpu": cpu, "per_session": per_session, "p50": p50, "p99": p99}
+
+
+if __name__ == "__main__":
+    asyncio.run(load_test())
@@ -0,0 +1,108 @@
+import difflib
+import os
+
+from tobyscript.lib.script import Event, Interner, parse
+
+
+def same_events(a: list[Event], b: list[Event]) -> bool:
+    """Whether two lists of `Event`s have the same types and data, in order."""
+    return len(a) == len(b) and all(type(x) is type(y) and x.data == y.data for x, y in zip(a, b))
+
+
+class ScriptWatcher:
+    def __init__(self, path: str | os.PathLike, interval: float = 0.5):
+        """Keeps a TobyScript file's lines parsed, and re-parses only the lines that changed when the file does.
+
+        * `self.lines`: `list[str]` - the lines of the file, as `readlines()` returns them.
+        * `self.events`: `list[list[Event]]` - `parse(line)` for each line. Treat these as read-only.
+        * `self.interval`: `float` - how often, in seconds, `poll()` checks the file's mtime.
+        """
+        self.path = os.fspath(path)
+        self.interval = interval
+
+        self.lines: list[str] = []
+        self.events: list[list[Event]] = []
+        self.interner = Interner()
+        self._live_events = 0
+        self._hashes: list[int] = []
+        self._mtime = 0.0
+        self._since_check = 0.0
+
+    def _read(self) -> list[str]:
+        self._mtime = os.stat(self.path).st_mtime
+        with open(self.path, encoding = "utf-8") as f:
+            return f.readlines()
+
+    def load(self):
+        """(Re)read and parse the whole file."""
+        self.lines = self._read()
+        self._hashes = [hash(line) for line in self.lines]
+        self.interner = Interner()
+        self.events = [parse(line, interner = self.interner) for line in self.lines]
+        self._live_events = len(self.interner.events)
+
+    def poll(self, delta_time: float) -> list[int] | None:
+        """Call every frame. Every `interval` seconds, reloads the file if its mtime changed.
+
+        Returns `None` if nothing changed, otherwise what `reload()` returns."""
+        self._since_check += delta_time
+        if self._since_check < self.interval:
+            return None
+        self._since_check = 0.0
+        try:
+            if os.stat(self.path).st_mtime == self._mtime:
+                return None
+        except FileNotFoundError:
+            # Editors often replace the file instead of writing it; try again next time.
+            return None
+        return self.reload()
+
+    def reload(self) -> list[int]:
+        """Diff the file against the last version by line hashes, and re-parse only the lines that differ.
+
+        `self.lines` and `self.events` are patched in place.
+        Returns a list mapping each old line index to its new index. Old lines that were changed or deleted
+        map to the nearest new line (which may be out of range, if the file got shorter.)"""
+        new_lines = self._read()
+        new_hashes = [hash(line) for line in new_lines]
+        old_hashes = self._hashes
+
+        # Most edits touch a few lines in the middle, so only diff what's between the common prefix and suffix.
+        n, m = len(old_hashes), len(new_hashes)
+        start = 0
+        while start < min(n, m) and old_hashes[start] == new_hashes[start]:
+            start += 1
+        end = 0
+        while end < min(n, m) - start and old_hashes[n - 1 - end] == new_hashes[m - 1 - end]:
+            end += 1
+
+        remap = list(range(start))
+        new_events: list[list[Event]] = []
+        matcher = difflib.SequenceMatcher(None, old_hashes[start:n - end], new_hashes[start:m - end], autojunk = False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                new_events.extend(self.events[start + i1:start + i2])
+            else:
+                new_events.extend(parse(line, interner = self.interner) for line in new_lines[start + j1:start + j2])
+            for i in range(i1, i2):
+                remap.append(start + j1 + min(i - i1, max(j2 - j1 - 1, 0)))
+        remap.extend(range(m - end, m))
+
+        self.events[start:n - end] = new_events
+        self.lines[:] = new_lines
+        self._hashes = new_hashes
+        # The interner still holds everything the old versions of edited lines used, so every edit grows it.
+        # Rebuilding it takes as long as parsing the file once, so only do it once it's doubled.
+        if len(self.interner.events) > 2 * self._live_events:
+            self.compact()
+        return remap
+
+    def compact(self):
+        """Rebuild `self.interner` from just the events still in `self.events`.
+
+        Those are already the shared events, so the new interner keeps them as they are, and no list changes."""
+        self.interner = Interner()
+        for events in self.events:
+            for e in events:
+                self.interner.event(e)
+        self._live_events = len(self.interner.events)
@@ -1,5 +1,7 @@
+import argparse
 import importlib.resources as pkg_resources
 import logging
+import time
 
 import arcade
 from arcade import Window
@@ -7,6 +9,7 @@ import pyglet
 from digiformatter import logger as digilogger
 
 import tobyscript.data.fonts
+from tobyscript.views.multibox import MultiBoxView
 from tobyscript.views.screen import ScreenView
 
 SCREEN_WIDTH = 1280
@@ -42,10 +45,13 @@ def setup_logging():
 
 
 class Game(Window):
-    def __init__(self):
+    def __init__(self, script_path: str | None = None, watch: bool = False, stress: list[int] | None = None, adaptive: bool = False):
         super().__init__(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE, update_rate = 1 / FPS_CAP)
 
-        self.initial_view = ScreenView()
+        if stress is not None:
+            self.initial_view = MultiBoxView(counts = tuple(stress)) if stress else MultiBoxView()
+        else:
+            self.initial_view = ScreenView(script_path = script_path, watch = watch, adaptive = adaptive, update_rate = 1 / FPS_CAP)
 
     def setup(self):
         logger.info("Setting up view...")
@@ -55,9 +61,30 @@ class Game(Window):
 
 
 def main():
+    parser = argparse.ArgumentParser(prog = "tobyscript")
+    parser.add_argument("script", nargs = "?", help = "TobyScript file to play (defaults to a bundled example)")
+    parser.add_argument("--watch", action = "store_true", help = "reload the script when it changes on disk")
+    parser.add_argument("--stress", nargs = "*", type = int, metavar = "N",
+                        help = "type N boxes at once for each N given (default 1 4 16 64 256), and log draw calls and frame times")
+    parser.add_argument("--adaptive", action = "store_true", help = "only update at full rate while text is typing")
+    parser.add_argument("--measure-idle", type = float, metavar = "SECONDS",
+                        help = "sit idle for SECONDS, log the CPU time used per minute, and quit")
+    args = parser.parse_args()
+
     setup_logging()
-    window = Game()
+    window = Game(args.script, args.watch, args.stress, args.adaptive)
     window.setup()
+
+    if args.measure_idle:
+        # The viewer starts paused, so as long as no keys are pressed this is all idle time.
+        start = time.process_time()
+
+        def report(delta_time: float):
+            cpu = time.process_time() - start
+            logger.info(f"CPU time while idle: {cpu / delta_time * 60:.2f}s per minute (adaptive {'on' if args.adaptive else 'off'})")
+            window.close()
+
+        pyglet.clock.schedule_once(report, args.measure_idle)
     arcade.run()
 
 
@@ -0,0 +1,102 @@
+import importlib.resources as pkg_resources
+from typing import Iterator, Optional
+
+import arcade
+import pyglet
+
+import tobyscript.data
+from tobyscript.lib.script import CloseEvent, ColorEvent, Event, SkipEvent, SpeakerEvent, TextSizeEvent, WaitEvent
+from tobyscript.lib.stream import DELAY_PER_CHARACTER, Sound, steps
+
+
+class DialogueBox:
+    def __init__(self, events: list[Event], sprite_list: arcade.SpriteList, batch: pyglet.graphics.Batch, *,
+                 center_x: float, center_y: float, scale: float = 1.5, delay_per_character: float = DELAY_PER_CHARACTER,
+                 wait: float = 0.5):
+        """A text box that types out `events` over and over, without waiting for input.
+
+        * `wait`: how many seconds to hold the text for each `WaitEvent`, since there's no one to press a key.
+
+        The box's frame is added to `sprite_list` and its text to `batch`, so any number of boxes
+        can be drawn with one `sprite_list.draw()` and one `batch.draw()`."""
+        self.events = events
+        self.delay_per_character = delay_per_character
+        self.wait = wait
+
+        with pkg_resources.path(tobyscript.data, "spr_message_box.png") as p:
+            self.sprite = arcade.Sprite(p, scale)
+        self.sprite.center_x = center_x
+        self.sprite.center_y = center_y
+        self.sprite_list = sprite_list
+        self.sprite_list.append(self.sprite)
+
+        text_position = (28 * scale, 46 * scale)
+        self._font_size = 20.5 * scale
+        self.document = pyglet.text.document.FormattedDocument("")
+        self.label = pyglet.text.DocumentLabel(document = self.document,
+            x = int(self.sprite.left + text_position[0]), y = int(self.sprite.top - text_position[1]),
+            width = int(self.sprite.width - text_position[0]), height = int(self.sprite.height - text_position[1]),
+            anchor_x = "left", anchor_y = "baseline", multiline = True, batch = batch)
+
+        self._steps: Iterator[tuple[float, str, Optional[Event], Optional[Sound]]] = iter(())
+        self._next: Optional[tuple[float, str, Optional[Event], Optional[Sound]]] = None
+        self._wait = 0.0
+        self.restart()
+
+    def restart(self):
+        self.document.delete_text(0, len(self.document.text))
+        self.font_name = "Determination Mono"
+        self.font_small = False
+        self.font_color = arcade.color.WHITE
+        self._steps = steps(self.events, self.delay_per_character)
+        self._next = next(self._steps, None)
+        self._wait = 0.0
+
+    @property
+    def font_size(self) -> float:
+        return self._font_size * 0.75 if self.font_small else self._font_size
+
+    def push_char(self, c: str):
+        self.document.insert_text(len(self.document.text), c, {
+            "font_name": self.font_name,
+            "font_size": self.font_size,
+            "color": self.font_color})
+
+    def apply(self, event: Event):
+        if isinstance(event, ColorEvent):
+            self.font_color = event.rgba
+        elif isinstance(event, TextSizeEvent):
+            self.font_small = event.small
+        elif isinstance(event, SpeakerEvent):
+            if event.speaker == "Sans":
+                self.font_name = "Sans Undertale"
+            elif event.speaker == "Papryus":
+                self.font_name = "Papryus Pixel Mono"
+            else:
+                self.font_name = "Determination Mono"
+        elif isinstance(event, (SkipEvent, CloseEvent)):
+            self.document.delete_text(0, len(self.document.text))
+
+    def update(self, delta_time: float):
+        self._wait += delta_time
+        # Lay the text out once for everything typed this frame, not once per character; otherwise a slow frame
+        # means more characters (and more layouts) next frame, and it never catches up.
+        self.label.begin_update()
+        while self._next is not None and self._wait >= self._next[0]:
+            delay, char, event, _ = self._next
+            self._wait -= delay
+            if event is None:
+                self.push_char(char)
+            else:
+                self.apply(event)
+                if isinstance(event, WaitEvent):
+                    # Hold off the next step (or the restart) for a bit, so the text is on screen long enough to see.
+                    self._wait -= self.wait
+            self._next = next(self._steps, None)
+        if self._next is None and self._wait >= 0:
+            self.restart()
+        self.label.end_update()
+
+    def delete(self):
+        self.label.delete()
+        self.sprite_list.remove(self.sprite)
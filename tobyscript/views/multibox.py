@@ -0,0 +1,144 @@
+import importlib.resources as pkg_resources
+import logging
+import math
+import time
+
+import arcade
+import arcade.gl.vertex_array
+import pyglet
+import pyglet.graphics.vertexdomain
+
+import tobyscript.data
+from tobyscript.lib.script import parse_lines
+from tobyscript.objects.box import DialogueBox
+
+logger = logging.getLogger("tobyscript")
+
+GL_DRAW_FUNCTIONS = ("glDrawArrays", "glDrawElements", "glMultiDrawArrays", "glMultiDrawElements")
+# arcade.gl (which `SpriteList`s draw with) looks these up on `pyglet.gl` every call.
+ARCADE_GL_DRAW_FUNCTIONS = ("glDrawArraysInstanced", "glDrawElementsInstanced")
+
+
+class DrawCallCounter:
+    def __init__(self):
+        """Counts the GL draw calls made while drawing `Batch`es and `SpriteList`s, by wrapping the GL functions
+        pyglet's vertex domains and arcade.gl call."""
+        self.count = 0
+        self._originals = {}
+
+    def _wrap(self, f):
+        def wrapped(*args):
+            self.count += 1
+            return f(*args)
+        return wrapped
+
+    def install(self):
+        for module, names in ((pyglet.graphics.vertexdomain, GL_DRAW_FUNCTIONS),
+                              (arcade.gl.vertex_array.gl, ARCADE_GL_DRAW_FUNCTIONS)):
+            for name in names:
+                f = getattr(module, name, None)
+                if f is not None and (module, name) not in self._originals:
+                    self._originals[(module, name)] = f
+                    setattr(module, name, self._wrap(f))
+
+    def uninstall(self):
+        for (module, name), f in self._originals.items():
+            setattr(module, name, f)
+        self._originals = {}
+
+
+class MultiBoxView(arcade.View):
+    def __init__(self, *args, counts: tuple[int, ...] = (1, 4, 16, 64, 256), duration: float = 5.0, **kwargs):
+        """Types out many text boxes at once, all drawn with one shared `SpriteList` and one shared `Batch`.
+
+        Runs each number of boxes in `counts` for `duration` seconds, logs the draw calls and frame times for each,
+        then closes the window."""
+        super().__init__(*args, **kwargs)
+
+        self.counts = counts
+        self.duration = duration
+        self.counter = DrawCallCounter()
+
+        self.sprite_list: arcade.SpriteList = None
+        self.batch: pyglet.graphics.Batch = None
+        self.boxes: list[DialogueBox] = []
+        self.results: list[str] = []
+
+    def setup(self):
+        with pkg_resources.open_text(tobyscript.data, "true_lab.txt") as f:
+            self.event_lists = [events for events in parse_lines(f.read()) if events]
+        self.stage = 0
+        self.spawn(self.counts[self.stage])
+
+    def spawn(self, n: int):
+        for box in self.boxes:
+            box.delete()
+        self.sprite_list = arcade.SpriteList()
+        self.batch = pyglet.graphics.Batch()
+
+        columns = math.ceil(math.sqrt(n))
+        rows = math.ceil(n / columns)
+        cell_width = self.window.width / columns
+        cell_height = self.window.height / rows
+        # The box sprite is 578x152.
+        scale = min(cell_width / 578, cell_height / 152) * 0.95
+        self.boxes = [DialogueBox(self.event_lists[i % len(self.event_lists)], self.sprite_list, self.batch,
+                                  center_x = cell_width * (i % columns + 0.5),
+                                  center_y = self.window.height - cell_height * (i // columns + 0.5),
+                                  scale = scale)
+                      for i in range(n)]
+
+        self._elapsed = 0.0
+        self._frame_times: list[float] = []
+        self._draw_times: list[float] = []
+        self._draw_calls = 0
+        self._last_frame = None
+        logger.info(f"Spawned {n} boxes.")
+
+    def report(self) -> str:
+        frames = len(self._draw_times)
+        frame_times = sorted(self._frame_times) or [0.0]
+        mean = sum(frame_times) / len(frame_times)
+        p99 = frame_times[int(len(frame_times) * 0.99)]
+        draw = sum(self._draw_times) / max(frames, 1)
+        draw_calls = self._draw_calls / max(frames, 1)
+        return (f"{len(self.boxes):>4} boxes: {draw_calls:5.1f} draw calls/frame, "
+                f"frame {mean * 1000:6.2f}ms mean / {p99 * 1000:6.2f}ms p99 ({1 / mean if mean else 0:5.1f} FPS), "
+                f"draw {draw * 1000:6.2f}ms")
+
+    def on_show_view(self):
+        self.counter.install()
+
+    def on_hide_view(self):
+        self.counter.uninstall()
+
+    def on_update(self, delta_time: float):
+        for box in self.boxes:
+            box.update(delta_time)
+
+        self._elapsed += delta_time
+        if self._elapsed < self.duration:
+            return
+
+        self.results.append(self.report())
+        logger.info(self.results[-1])
+        self.stage += 1
+        if self.stage < len(self.counts):
+            self.spawn(self.counts[self.stage])
+        else:
+            logger.info("Results:\n" + "\n".join(self.results))
+            self.counter.uninstall()
+            self.window.close()
+
+    def on_draw(self):
+        start = time.perf_counter()
+        if self._last_frame is not None:
+            self._frame_times.append(start - self._last_frame)
+        self._last_frame = start
+
+        self.clear()
+        self.counter.count = 0
+        self.sprite_list.draw(pixelated = True)
+        self.batch.draw()
+        self._draw_calls += self.counter.count
+        self._draw_times.append(time.perf_counter() - start)
@@ -8,7 +8,8 @@ import pyglet
 from pyglet.math import Vec2
 
 import tobyscript.data
-from tobyscript.lib.script import AnimationEvent, CloseEvent, EmotionEvent, FaceEvent, SkipEvent, SoundEvent, SpeakerEvent, WaitEvent, parse, Event, TextEvent, PauseEvent, ColorEvent, TextSizeEvent
+from tobyscript.lib.script import AnimationEvent, CloseEvent, EmotionEvent, FaceEvent, SkipEvent, SoundEvent, SpeakerEvent, WaitEvent, Event, TextEvent, PauseEvent, ColorEvent, TextSizeEvent
+from tobyscript.lib.watch import ScriptWatcher, same_events
 
 logger = logging.getLogger("tobyscript")
 
@@ -16,9 +17,32 @@ pyglet.options["debug_font"] = True
 
 
 class ScreenView(arcade.View):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, script_path: str | None = None, watch: bool = False,
+                 adaptive: bool = False, update_rate: float = 1 / 60, draw_rate: float = 1 / 60, idle_rate: float = 1 / 4,
+                 **kwargs):
+        """Plays a TobyScript file line by line.
+
+        * `script_path`: the file to play. Defaults to the bundled `ma.txt`.
+        * `watch`: whether to hot-reload the file when it changes on disk.
+        * `adaptive`: whether to only update at `update_rate` and draw at `draw_rate` while typing. While paused or
+        out of text, update and draw every `idle_rate` seconds (or on a key press), and during a `PauseEvent`, update
+        and draw once when it ends."""
         super().__init__(*args, **kwargs)
 
+        self.adaptive = adaptive
+        self.update_rate = update_rate
+        self.draw_rate = draw_rate
+        self.idle_rate = idle_rate
+        self._scheduled_rates = (update_rate, draw_rate)
+
+        if script_path is None:
+            with pkg_resources.path(tobyscript.data, "ma.txt") as p:
+                script_path = str(p.absolute())
+        self.watcher = ScriptWatcher(script_path)
+        # Only parse the whole script once; setup() runs again on every CloseEvent.
+        self.watcher.load()
+        self.watch = watch
+
         self.color = arcade.color.GREEN
 
         window = arcade.get_window()
@@ -67,11 +91,11 @@ class ScreenView(arcade.View):
 
         self.recalc(1.5)
 
-        self.lines: list[str] = []
-        with pkg_resources.open_text(tobyscript.data, "ma.txt") as f:
-            self.lines = f.readlines()
+        self.lines: list[str] = self.watcher.lines
+        self.line_index = -1
         self.current_line = ""
         self.text_events: list[Event] = []
+        self._line_events: list[Event] = []
 
         self.debug_label = pyglet.text.Label(self.current_line, font_name="Determination Mono", font_size = 10,
             width = self.window.width,
@@ -128,7 +152,9 @@ class ScreenView(arcade.View):
                 self.beep.play()
 
     def setup_text(self):
-        self.text_events = parse(self.current_line)
+        # on_update pops from text_events, so don't hand it the watcher's list.
+        self._line_events = self.watcher.events[self.line_index]
+        self.text_events = list(self._line_events)
         self.debug_label.text = self.current_line
         self.font_color = arcade.color.WHITE
         self.speaker = "Default"
@@ -139,9 +165,36 @@ class ScreenView(arcade.View):
 
     def next_line(self):
         self.document.delete_text(0, len(self.document.text))
-        self.current_line = self.lines.pop(0)
+        self.line_index += 1
+        self.current_line = self.lines[self.line_index]
         self.setup_text()
 
+    def on_script_changed(self, remap: list[int]):
+        """Follow the current line to its new position after a hot-reload.
+
+        If the current line was edited, keep playing from the same event if everything already played is unchanged,
+        otherwise replay the line from the start."""
+        if self.line_index < 0 or not self.lines:
+            return
+        self.line_index = min(remap[self.line_index], len(self.lines) - 1)
+        new_events = self.watcher.events[self.line_index]
+        if new_events is self._line_events:
+            return
+
+        self.current_line = self.lines[self.line_index]
+        self.debug_label.text = self.current_line
+        played = len(self._line_events) - len(self.text_events)
+        if same_events(self._line_events[:played], new_events[:played]):
+            self._line_events = new_events
+            self.text_events = list(new_events[played:])
+            logger.info(f"Reloaded string: {self.current_line}")
+        else:
+            self.document.delete_text(0, len(self.document.text))
+            self._current_string = ""
+            self._current_pause = 0
+            self.paused = False
+            self.setup_text()
+
     def on_show_view(self):
         pass
 
@@ -152,14 +205,44 @@ class ScreenView(arcade.View):
             if self._current_string:
                 return
             self.paused = False
-            if not self.paused and self.lines:
+            if not self.paused and self.line_index < len(self.lines) - 1:
                 self.next_line()
         if symbol == arcade.key.D and modifiers & arcade.key.MOD_CTRL:
             self.debug = not self.debug
         if symbol == arcade.key.BACKSPACE:
             self.setup()
+        if self.adaptive:
+            self.reschedule()
+
+    def reschedule(self):
+        """Set the window's update and draw rates for what's happening right now."""
+        if self.paused:
+            rates = (self.idle_rate, self.idle_rate)
+        elif self._current_pause:
+            # Wake up right when the pause is over.
+            rate = max(self._current_pause - self._current_wait, self.update_rate)
+            rates = (rate, rate)
+        elif not self.text_events and not self._current_string:
+            # The line ran out without a WaitEvent (e.g. the last line), so there's nothing left to type.
+            rates = (self.idle_rate, self.idle_rate)
+        else:
+            rates = (self.update_rate, self.draw_rate)
+        if rates != self._scheduled_rates:
+            self.window.set_update_rate(rates[0])
+            self.window.set_draw_rate(rates[1])
+            self._scheduled_rates = rates
 
     def on_update(self, delta_time: float):
+        self.step(delta_time)
+        if self.adaptive:
+            self.reschedule()
+
+    def step(self, delta_time: float):
+        if self.watch:
+            remap = self.watcher.poll(delta_time)
+            if remap is not None:
+                self.on_script_changed(remap)
+
         if self.paused:
             return
 